@@ -4,20 +4,35 @@ AI-powered evaluator for micro-saas ideas.
 
 import os
 import json
+import orjson
+import msgpack
 
 # import openai
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
+from io import StringIO
 from pathlib import Path
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from src.config import Config
+from src.http_session import build_session
+from src.cache import RedisCache, atomic_write_bytes, response_cache
 import logging
-import re  # for regex matching in _extract_json
+
+try:  # linear-time matching on untrusted LLM output
+    import re2 as re
+except ImportError:
+    import re
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# inline (?s) instead of re.DOTALL: google-re2 has no flag constants.
+# Greedy .* is safe here since RE2 never backtracks.
+_JSON_FENCE_RE = re.compile(r"(?s)```(?:json)?\s*(\[.*\])\s*```")
+# raw_decode stops at the end of the first value, ignoring trailing notes
+_JSON_DECODER = json.JSONDecoder()
+
 
 @dataclass
 class EvaluatedIdea:
@@ -50,7 +65,7 @@ class AIEvaluator:
         "the output must be ranked in descending order by the score"
     )
 
-    def __init__(self, keyword: str):
+    def __init__(self, keyword: Optional[str] = None):
         self.url = "https://api.deepseek.com/v1/chat/completions"
         self.key = os.getenv(
             "DEEPSEEK_APIKEY"
@@ -60,18 +75,68 @@ class AIEvaluator:
             "Content-Type": "application/json",
         }
         self.keyword = keyword
+        self.session = build_session(headers=self.headers)
+        # fixed part of every request, only the user message and max_tokens vary
+        self._system_message = {"role": "system", "content": self.SYSTEM_PROMPT}
+        self._base_payload = {
+            "model": "deepseek-chat",
+            "temperature": 0.25,
+            "top_p": 0.95,
+            "stream": True,  # tokens arrive as server-sent events
+        }
 
     def _extract_json(self, text: str) -> list:
         """Pull the first JSON array from the response."""
-        # 1. look for ```json [...] ```
-        match = re.search(r"```(?:json)?\s*(\[.*?\])\s*```", text, re.DOTALL)
-        if not match:
-            # 2. fallback: first bare [...]
-            match = re.search(r"(\[.*?\])", text, re.DOTALL)
-        if not match:
-            logger.error("No JSON block found in response:\n%s", text)
-            raise ValueError("Invalid JSON from DeepSeek")
-        return json.loads(match.group(1))
+        # fast path: the response is already a bare JSON array
+        stripped = text.strip()
+        if stripped.startswith("["):
+            try:
+                return orjson.loads(stripped)
+            except ValueError:
+                pass
+        # 1. first [ inside a ```json fence, 2. fallback: first bare [
+        fence = _JSON_FENCE_RE.search(text)
+        starts = [fence.start(1)] if fence else []
+        starts.append(text.find("["))
+        for start in dict.fromkeys(starts):
+            if start < 0:
+                continue
+            try:
+                return _JSON_DECODER.raw_decode(text, start)[0]
+            except ValueError:
+                pass
+        logger.error("No JSON block found in response:\n%s", text)
+        raise ValueError("Invalid JSON from DeepSeek")
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _read_stream(self, resp) -> str:
+        """
+        Accumulate the content deltas of a streamed chat completion.
+        Each event line is `data: {json chunk}`,
+        the stream ends with `data: [DONE]`.
+        """
+        buffer = StringIO()
+        for line in resp.iter_lines():
+            if not line.startswith(b"data:"):
+                continue  # blank separators and keep-alive comments
+            data = line[5:].strip()
+            if data == b"[DONE]":
+                break
+            for choice in orjson.loads(data).get("choices", []):
+                content = choice.get("delta", {}).get("content")
+                if content:
+                    buffer.write(content)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _score(row: Dict[str, Any]) -> float:
+        """Numeric score of a row, 0 when the LLM sent a missing or odd value."""
+        try:
+            return float(row.get("score") or 0)
+        except (TypeError, ValueError):
+            return 0.0
 
     def _merge_list_dictionaries(
         self, original: List[Dict[str, Any]], new: List[Dict[str, Any]]
@@ -80,47 +145,45 @@ class AIEvaluator:
         Merge two lists of dictionaries, updating the original with new values.
         If a key exists in both, the value from the new dictionary is used.
         """
-        merged = original.copy()
-        for idx, new_dict in enumerate(new):
-            for key, value in new_dict.items():
-                if key in merged[idx]:
-                    logger.warning(f"Overwriting key '{key}' with new value: {value}")
-                    continue  # Skip if key already exists
-                merged[idx][key] = value
-        return merged
-
-    def evaluate(self, ideas: List[Dict[str, str]]) -> List[EvaluatedIdea]:
+        if logger.isEnabledFor(logging.WARNING):
+            for orig, new_row in zip(original, new):
+                for key in orig.keys() & new_row.keys():
+                    logger.warning(
+                        f"Overwriting key '{key}' with new value: {new_row[key]}"
+                    )
+        # fresh dicts, the caller's rows are left untouched
+        return [{**orig, **new_row} for orig, new_row in zip(original, new)]
+
+    def _evaluate_batch(self, ideas: List[Dict[str, str]]) -> List[Dict[str, Any]]:
         """
-        Evaluate a list of micro-saas ideas using AI.
-        Each idea is a dictionary with 'idea' and 'description' keys.
-        Returns a list of EvaluatedIdea instances.
+        Send one DeepSeek request for a batch of ideas.
+        Returns the batch merged with the AI evaluation of each idea.
         """
+        # each row is a single {idea: description} pair
+        pairs = [next(iter(row.items())) for row in ideas]
         prompt = "\n".join(
-            f"{i+1}. Idea: {key}\n   Description: {value}"
-            for i, row in enumerate(ideas)
-            for key, value in row.items()
+            f"{i}. Idea: {key}\n   Description: {value}"
+            for i, (key, value) in enumerate(pairs, 1)
         )
 
         payload = {
-            "model": "deepseek-chat",
-            "messages": [
-                {"role": "system", "content": self.SYSTEM_PROMPT},
-                {"role": "user", "content": prompt},
-            ],
-            "temperature": 0.25,
+            **self._base_payload,
+            "messages": [self._system_message, {"role": "user", "content": prompt}],
             "max_tokens": min(300 * len(ideas), 4096),  # limit to 4096 tokens
-            "top_p": 0.95,
         }
-        print(f"Evaluating {len(ideas)} ideas...")
-        resp = requests.post(
+        cache_key = RedisCache.make_key("ds", payload["messages"])
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        with self.session.post(
             self.url,
-            headers=self.headers,
             json=payload,
             timeout=Config.DEEPSEEK_TIMEOUT,
-        )
-        print(f"Response status: {resp.status_code}")
-        resp.raise_for_status()
-        raw = resp.json()["choices"][0]["message"]["content"]
+            stream=True,
+        ) as resp:
+            print(f"Response status: {resp.status_code}")
+            resp.raise_for_status()
+            raw = self._read_stream(resp)
         # print(f"Raw response: {raw}")
         results = self._extract_json(raw)
         # results = [
@@ -128,9 +191,34 @@ class AIEvaluator:
         #     for idea, result in zip(ideas, results)
         # ]
         results = self._merge_list_dictionaries(ideas, results)
+        response_cache.set(cache_key, results, Config.DEEPSEEK_CACHE_TTL)
+        return results
 
-        with open(Path(Config.CACHE_DIR, f"deepseek_{self.keyword}.json"), "w") as f:
-            json.dump(results, f, indent=2)
+    def evaluate(
+        self, ideas: List[Dict[str, str]], keyword: Optional[str] = None
+    ) -> List[EvaluatedIdea]:
+        """
+        Evaluate a list of micro-saas ideas using AI.
+        Each idea is a dictionary with 'idea' and 'description' keys.
+        keyword overrides the one given at init, it only names the dump file.
+        Ideas are sent in batches of Config.DEEPSEEK_BATCH_SIZE, in parallel.
+        Returns a list of EvaluatedIdea instances.
+        """
+        size = Config.DEEPSEEK_BATCH_SIZE
+        batches = [ideas[i : i + size] for i in range(0, len(ideas), size)]
+        print(f"Evaluating {len(ideas)} ideas in {len(batches)} batches...")
+        with ThreadPoolExecutor(max_workers=Config.DEEPSEEK_MAX_WORKERS) as pool:
+            # map() yields in submission order, so results stay aligned with ideas
+            results = [
+                row for batch in pool.map(self._evaluate_batch, batches) for row in batch
+            ]
+        # each batch is only ranked within itself, restore the global ranking
+        results.sort(key=self._score, reverse=True)
+
+        atomic_write_bytes(
+            Path(Config.CACHE_DIR, f"deepseek_{keyword or self.keyword}.msgpack"),
+            msgpack.packb(results, use_bin_type=True),
+        )
         # return [
         #     EvaluatedIdea(
         #         idea=ideas[i]["idea"], description=ideas[i]["description"], **r
@@ -1,11 +1,33 @@
 # pip install fastapi uvicorn
+from contextlib import asynccontextmanager
+from typing import Optional
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from src.micro_saas_client import MicroSaasClient
+from src.micro_saas_client import AsyncMicroSaasClient
 from src.ai_evaluator import AIEvaluator
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+# shared across requests so the connection pools are reused
+_client: Optional[AsyncMicroSaasClient] = None
+_evaluator: Optional[AIEvaluator] = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared client sessions on startup and close them on shutdown."""
+    global _client, _evaluator
+    _client = AsyncMicroSaasClient()
+    _evaluator = AIEvaluator()
+    try:
+        yield
+    finally:
+        _evaluator.close()
+        await _client.close()
+
+
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -26,8 +48,7 @@ async def root():
 
 @app.post("/evaluate")
 async def evaluate(req: Req):
-    client = MicroSaasClient()
-    ideas  = await client.deep_extract_ideas(req.keyword, req.limit)
-    evaluator = AIEvaluator(req.keyword)
-    return evaluator.evaluate(ideas)
+    ideas = await _client.deep_extract_ideas(req.keyword, req.limit)
+    # evaluate() blocks on DeepSeek, keep it off the event loop
+    return await run_in_threadpool(_evaluator.evaluate, ideas, req.keyword)
 # uvicorn main:app --reload --port 8000
\ No newline at end of file
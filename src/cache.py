@@ -0,0 +1,113 @@
+"""
+Response cache shared by the API clients.
+"""
+
+import os
+import asyncio
+import orjson
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+from src.config import Config
+
+try:
+    import redis
+except ImportError:  # redis is optional, the cache is simply disabled
+    redis = None
+
+
+logger = logging.getLogger(__name__)
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> bool:
+    """
+    Write data to path through a unique temp file and os.replace,
+    so neither a crash nor a concurrent writer leaves a torn file behind.
+    Skips the write when the file already holds the same bytes.
+    Returns True if the file was written.
+    """
+    if path.exists() and path.read_bytes() == data:
+        return False
+    fd, tmp = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return True
+
+
+class RedisCache:
+    """
+    JSON wrapper around Redis used to memoise external API responses.
+    Every lookup is a miss when REDIS_URL is unset or redis is not installed,
+    and Redis errors never break the underlying call.
+    """
+
+    def __init__(self, url: Optional[str] = Config.REDIS_URL):
+        self.client = (
+            redis.Redis.from_url(
+                url,
+                socket_connect_timeout=Config.REDIS_SOCKET_TIMEOUT,
+                socket_timeout=Config.REDIS_SOCKET_TIMEOUT,
+            )
+            if redis and url
+            else None
+        )
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(prefix: str, obj: Any) -> str:
+        """Build a stable key from the sha256 of a JSON-serialisable object."""
+        digest = hashlib.sha256(
+            orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+        ).hexdigest()
+        return f"{prefix}:{digest}"
+
+    def get(self, key: str) -> Any:
+        """Return the cached value for key, or None on a miss."""
+        if self.client is None:
+            return None
+        try:
+            cached = self.client.get(key)
+        except redis.RedisError as e:
+            logger.warning("Redis get failed for %s: %s", key, e)
+            cached = None
+        if cached is None:
+            self.misses += 1
+            logger.info("cache-miss %s (hits=%d, misses=%d)", key, self.hits, self.misses)
+            return None
+        self.hits += 1
+        logger.info("cache-hit %s (hits=%d, misses=%d)", key, self.hits, self.misses)
+        return orjson.loads(cached)
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        """Store value under key for ttl seconds."""
+        if self.client is None:
+            return
+        try:
+            self.client.setex(key, ttl, orjson.dumps(value))
+        except redis.RedisError as e:
+            logger.warning("Redis set failed for %s: %s", key, e)
+
+    async def aget(self, key: str) -> Any:
+        """get() for coroutines, the blocking call runs in a worker thread."""
+        if self.client is None:
+            return None
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: Any, ttl: int) -> None:
+        """set() for coroutines, the blocking call runs in a worker thread."""
+        if self.client is None:
+            return
+        await asyncio.to_thread(self.set, key, value, ttl)
+
+
+response_cache = RedisCache()
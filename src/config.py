@@ -20,8 +20,20 @@ class Config:
     API_KEY = os.getenv("SUPABASE_APIKEY")
     USER_ID = "01b7b465-e18d-4340-9b2c-1e89cc7b1e57"
 
+    # ---------- Redis ----------
+    REDIS_URL = os.getenv("REDIS_URL")
+    DEEPSEEK_CACHE_TTL = 7 * 24 * 3600  # seconds
+    SUPABASE_CACHE_TTL = 300  # seconds
+    REDIS_SOCKET_TIMEOUT = 0.5  # seconds, a slow Redis must not stall requests
+
+    # ---------- DeepSeek ----------
+    DEEPSEEK_BATCH_SIZE = 5  # ideas per request
+    DEEPSEEK_MAX_WORKERS = 4  # concurrent requests
+
     # ---------- Timing ----------
     REQUEST_DELAY = 0.5  # seconds
+    SUPABASE_CONCURRENCY = 8  # in-flight requests
+    GENERATOR_CONCURRENCY = 2  # in-flight requests
     DEEPSEEK_TIMEOUT = 120
     TIMEOUT = 30
     SHORT_TIMEOUT = 3
@@ -0,0 +1,28 @@
+"""
+HTTP session helpers shared by the API clients.
+"""
+
+from typing import Dict, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def build_session(headers: Optional[Dict[str, str]] = None) -> requests.Session:
+    """
+    Build a requests.Session with a pooled, retrying HTTPAdapter
+    so consecutive calls to the same host reuse the TCP/TLS connection.
+    """
+    session = requests.Session()
+    if headers:
+        session.headers.update(headers)
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(
+            total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]
+        ),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
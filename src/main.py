@@ -1,6 +1,6 @@
 import sys
 import json
-from src.micro_saas_client import MicroSaasClient, ProxyManager
+from src.micro_saas_client import AsyncMicroSaasClient, ProxyManager
 from src.ai_evaluator import AIEvaluator, EvaluatedIdea
 import asyncio
 
@@ -9,17 +9,17 @@ async def main():
     Main function to run the micro-saas client demo.
     It initializes the client, checks proxy health, and fetches ideas based on user input.
     """
-    client = MicroSaasClient()
     proxy_manager = ProxyManager()
 
-    if not proxy_manager.healthy_proxy_check():
+    if not await proxy_manager.healthy_proxy_check():
         print("Exiting...")
         sys.exit(1)
     kw = input("Keyword? ").strip()
     ai_evaluator = AIEvaluator(kw)
     # ideas = client.get_ideas(kw)
     user_limit = input("How many ideas do you want to fetch? ").strip()
-    ideas = await client.deep_extract_ideas(kw, limit=int(user_limit))
+    async with AsyncMicroSaasClient(proxy_manager) as client:
+        ideas = await client.deep_extract_ideas(kw, limit=int(user_limit))
     if ideas:
         print(f"Found ideas for '{kw}':")
         evaluated_ideas = ai_evaluator.evaluate(ideas)
@@ -1,51 +1,152 @@
 import os
-import json
+import re
+import orjson
+import ijson
+import msgpack
 import time
 import random
 import requests
+import aiohttp
+from tenacity import (
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential,
+)
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 import logging
 import ast  # str to dict conversion
 from src.config import Config
+from src.cache import atomic_write_bytes, response_cache
+from src.http_session import build_session
 import asyncio
+import threading
+from contextlib import contextmanager
 from tqdm import tqdm
 
 
+_SAFE_RE = re.compile(r"\W")  # chars replaced in cache file names
+
+
+# failures that say something about the proxy rather than the upstream service
+_TRANSPORT_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    aiohttp.ClientConnectionError,
+    aiohttp.ClientHttpProxyError,  # proxy refused CONNECT (407, 502, ...)
+    asyncio.TimeoutError,
+)
+
+
 class ProxyManager:
     """
     Manages proxy rotation and health checks.
+    Proxies come from PROXY_URLS (comma-separated) or PROXY_URL, and each
+    one is scored by a latency EWMA plus a penalty per consecutive failure.
     """
 
+    FAIL_PENALTY_MS = 500
+    EWMA_ALPHA = 0.2
+
     def __init__(self):
-        self.proxies = {
-            "http": os.getenv("PROXY_URL"),
-            "https": os.getenv("PROXY_URL"),
-        }
-        self._current_proxy_index = 0
-
-    def ping_proxy(self) -> bool:
-        """Return True if proxy answers within 5 seconds."""
+        urls = os.getenv("PROXY_URLS") or os.getenv("PROXY_URL") or ""
+        self.pool: List[Dict[str, Any]] = [
+            {"url": url.strip(), "ewma_ms": 0.0, "fails": 0}
+            for url in urls.split(",")
+            if url.strip()
+        ]
+        self._lock = threading.Lock()
+
+    def choose_proxy(self) -> Optional[Dict[str, Any]]:
+        """Return the best scored proxy, or None when the pool is empty."""
+        if not self.pool:
+            return None
+        return min(
+            self.pool, key=lambda p: p["ewma_ms"] + self.FAIL_PENALTY_MS * p["fails"]
+        )
+
+    def record(
+        self, proxy: Optional[Dict[str, Any]], elapsed_ms: float, ok: bool
+    ) -> None:
+        """Update the score of a proxy after a request went through it."""
+        if proxy is None:
+            return
+        with self._lock:
+            if ok:
+                alpha = self.EWMA_ALPHA
+                proxy["ewma_ms"] = (1 - alpha) * proxy["ewma_ms"] + alpha * elapsed_ms
+                proxy["fails"] = 0
+            else:
+                proxy["fails"] += 1
+
+    @contextmanager
+    def track(self, proxy: Optional[Dict[str, Any]]):
+        """
+        Time the enclosed transport call and record it against proxy.
+        Only connection, proxy and timeout errors count as a proxy failure;
+        anything else (upstream statuses, retries exhausted on 5xx) is left
+        unscored. Keep response parsing outside of the block.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except _TRANSPORT_ERRORS:
+            self.record(proxy, 0.0, ok=False)
+            raise
+        self.record(proxy, (time.perf_counter() - start) * 1000, ok=True)
+
+    async def ping_proxy(
+        self, session: aiohttp.ClientSession, proxy: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        Return True if proxy answers within Config.SHORT_TIMEOUT seconds.
+        The result is recorded against proxy, so a proxy failing the check
+        is no longer preferred over a working one by choose_proxy.
+        """
+        start = time.perf_counter()
         try:
-            resp = requests.head(
+            async with session.head(
                 Config.PROXY_PING_URL,
-                proxies=self.proxies,
-                timeout=Config.SHORT_TIMEOUT,
+                proxy=proxy and proxy["url"],
+                timeout=aiohttp.ClientTimeout(total=Config.SHORT_TIMEOUT),
+            ) as resp:
+                healthy = resp.status == 200
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            healthy = False
+        self.record(proxy, (time.perf_counter() - start) * 1000, ok=healthy)
+        return healthy
+
+    async def _ping_with_deadline(
+        self, session: aiohttp.ClientSession, proxy: Optional[Dict[str, Any]]
+    ) -> bool:
+        """ping_proxy with a hard deadline, counting an overrun as a failure."""
+        try:
+            return await asyncio.wait_for(
+                self.ping_proxy(session, proxy), timeout=Config.SHORT_TIMEOUT
             )
-            return resp.status_code == 200
-        except requests.RequestException:
+        except asyncio.TimeoutError:
+            self.record(proxy, 0.0, ok=False)
             return False
 
-    def healthy_proxy_check(self) -> bool:
+    async def healthy_proxy_check(self) -> bool:
         """
-        Return only proxies that pass the ping test.
+        Ping every proxy of the pool concurrently.
+        Return True if at least one of them is healthy.
         """
         print("[INFO] checking proxies …")
-        healthy = self.ping_proxy()
-        print(f"healthy: {healthy}")
-        print(f"[INFO] The proxy is {'healthy' if healthy else 'unhealthy'}.")
-        return healthy
+        async with aiohttp.ClientSession() as session:
+            if not self.pool:
+                healthy = await self._ping_with_deadline(session, None)
+                status = "healthy" if healthy else "unhealthy"
+                print(f"[INFO] No proxy configured, direct connection is {status}.")
+                return healthy
+            results = await asyncio.gather(
+                *[self._ping_with_deadline(session, proxy) for proxy in self.pool]
+            )
+        print(f"[INFO] {sum(results)}/{len(results)} proxies are healthy.")
+        return any(results)
 
 
 class CacheManager:
@@ -58,15 +159,15 @@ class CacheManager:
         self.cache_dir.mkdir(exist_ok=True)
 
     def cache_file(self, keyword: str) -> Path:
-        safe = "".join(c if c.isalnum() else "_" for c in keyword.lower())
-        return self.cache_dir / f"{safe}.json"
+        safe = _SAFE_RE.sub("_", keyword.lower())
+        return self.cache_dir / f"{safe}.msgpack"
 
     def load_cached(self, keyword: str) -> Optional[str]:
         """Load cached idea-id for a keyword."""
         cache = self.cache_file(keyword)
         if cache.exists():
             print(f"[Info] Loading cached idea-id for '{keyword}'")
-            return json.loads(cache.read_text()).get("id")
+            return msgpack.unpackb(cache.read_bytes(), raw=False).get("id")
         return None
 
     def _createcache_file_names(self, keyword: str) -> tuple[str, str]:
@@ -91,12 +192,13 @@ class CacheManager:
         if "id" not in data:
             raise ValueError("Data must contain an 'id' field.")
         elif len(data.keys()) == 1:
-            self.cache_file(kw_id_file_name).write_text(json.dumps(data, indent=2))
+            path = self.cache_file(kw_id_file_name)
         else:
-            self.cache_file(ideas_file_name).write_text(json.dumps(data, indent=2))
+            path = self.cache_file(ideas_file_name)
+        atomic_write_bytes(path, msgpack.packb(data, use_bin_type=True))
 
     def list_cached_keywords(self) -> List[str]:
-        return [p.stem.replace("_", " ") for p in self.cache_dir.glob("*.json")]
+        return [p.stem.replace("_", " ") for p in self.cache_dir.glob("*.msgpack")]
 
 
 class MicroSaasClient:
@@ -123,13 +225,24 @@ class MicroSaasClient:
         "accept-profile": "public",
     }
 
-    def __init__(self):
-        self.proxies: dict = {
-            "http": os.getenv("PROXY_URL"),
-            "https": os.getenv("PROXY_URL"),
-        }
-        self._current_proxy_index = 0
+    def __init__(self, proxy_manager: Optional[ProxyManager] = None):
+        self.proxy_manager = proxy_manager or ProxyManager()
         self.cache_manager = CacheManager()
+        self.session = self._open_session()
+
+    def _open_session(self) -> requests.Session:
+        """HTTP session shared by every call of this client."""
+        return build_session(headers=self.HEADERS)
+
+    def _next_proxy(self) -> tuple[Optional[Dict[str, Any]], Optional[dict]]:
+        """
+        Pick the best proxy of the pool.
+        Returns (pool entry, requests proxies mapping), both None without proxy.
+        """
+        proxy = self.proxy_manager.choose_proxy()
+        if proxy is None:
+            return None, None
+        return proxy, {"http": proxy["url"], "https": proxy["url"]}
 
     # --------------- API calls --------------- #
     async def _call_id_generator(self, keyword: str) -> Optional[str]:
@@ -138,34 +251,45 @@ class MicroSaasClient:
         Returns the idea ID if successful, None otherwise.
         """
         payload = {"niche": keyword, "userId": "01b7b465-e18d-4340-9b2c-1e89cc7b1e57"}
-        # proxies = self._next_proxy()
+        proxy, proxies = self._next_proxy()
         try:
-            resp = requests.post(
-                self.GENERATOR_URL,
-                json=payload,
-                headers=self.HEADERS,
-                proxies=self.proxies,
-                timeout=30,
-            )
+            with self.proxy_manager.track(proxy):
+                resp = self.session.post(
+                    self.GENERATOR_URL, json=payload, proxies=proxies, timeout=30
+                )
             resp.raise_for_status()
 
-            return resp.json().get("id")
+            return orjson.loads(resp.content).get("id")
         except requests.HTTPError as e:
             print(f"[ERROR] generator failed: {e}")
             return None
-        except requests.RequestException as e:
+        except (requests.RequestException, ValueError, AttributeError) as e:
+            # ValueError: non-JSON body, AttributeError: JSON body is not an object
             print(f"[WARN] generator failed: {e}")
             return None
         finally:
             time.sleep(self.REQUEST_DELAY)
 
     async def _fetch_ideas(self, idea_id: str) -> Dict[str, Any]:
-        url = f"{self.SUPABASE_URL}?select=*&id=eq.{idea_id}"
-        # proxies = self._next_proxy()
-        resp = requests.get(url, headers=self.HEADERS, proxies=self.proxies, timeout=30)
-        resp.raise_for_status()
-        data = resp.json()
-        return data[0] if isinstance(data, list) and data else {}
+        cache_key = f"saas:{idea_id}"
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        # only the ideas column is needed, and it is parsed as it streams in
+        url = f"{self.SUPABASE_URL}?select=ideas&id=eq.{idea_id}"
+        proxy, proxies = self._next_proxy()
+        ideas_dict = {}
+        with self.proxy_manager.track(proxy):
+            resp = self.session.get(url, proxies=proxies, stream=True, timeout=30)
+        with resp:
+            resp.raise_for_status()
+            resp.raw.decode_content = True
+            for row in ijson.items(resp.raw, "item", use_float=True):
+                ideas_dict = {"id": idea_id, **row}
+                break
+        if ideas_dict:
+            response_cache.set(cache_key, ideas_dict, Config.SUPABASE_CACHE_TTL)
+        return ideas_dict
 
     def _extract_ideas(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
@@ -176,16 +300,19 @@ class MicroSaasClient:
             raise ValueError("Data must be a dictionary.")
         if "ideas" not in data:
             raise KeyError("Data must contain an 'ideas' field.")
-        ideas_dict = (
-            ast.literal_eval(str(data["ideas"]))
-            if isinstance(data["ideas"], str)
-            else {}
-        )
-        list_values = [value for _, value in ideas_dict.items()]
-        results = []
-        for idx in range(1, len(list_values), 2):
-            results.append({list_values[idx - 1]: list_values[idx]})
-        return results
+        raw = data["ideas"]
+        if isinstance(raw, dict):
+            ideas_dict = raw
+        elif isinstance(raw, str):
+            try:
+                ideas_dict = orjson.loads(raw)
+            except ValueError:
+                ideas_dict = ast.literal_eval(raw)
+        else:
+            ideas_dict = {}
+        # values alternate name, description, name, description, ...
+        it = iter(ideas_dict.values())
+        return [{name: description} for name, description in zip(it, it)]
 
     # --------------- public API --------------- #
     async def get_ideas(self, keyword: str) -> Optional[Dict[str, Any]]:
@@ -237,8 +364,186 @@ class MicroSaasClient:
                 max_nbr_requests -= 1
 
             final_result = [dict(idea) for idea in ideas]
-            results_file_name = f"ideas_{keyword.lower().replace(' ', '_')}_{limit}.json"
-            self.cache_manager.cache_file(results_file_name).write_text(
-                json.dumps(final_result, indent=2)
+            results_file_name = f"ideas_{keyword.lower().replace(' ', '_')}_{limit}"
+            atomic_write_bytes(
+                self.cache_manager.cache_file(results_file_name),
+                msgpack.packb(final_result, use_bin_type=True),
+            )
+            return final_result
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Retry on rate limiting (429) and server errors (5xx) only."""
+    return isinstance(exc, aiohttp.ClientResponseError) and (
+        exc.status == 429 or exc.status >= 500
+    )
+
+
+_retry_on_throttle = retry(
+    retry=retry_if_exception(_is_retryable),
+    wait=wait_exponential(multiplier=0.5, max=8),
+    stop=stop_after_attempt(4),
+    reraise=True,
+)
+
+
+class AsyncMicroSaasClient(MicroSaasClient):
+    """
+    Non-blocking variant of MicroSaasClient built on aiohttp.
+    A single ClientSession is shared by every call so connections are
+    kept alive, and the generator / Supabase requests are fired concurrently.
+    Must be instantiated from within a running event loop.
+    """
+
+    def __init__(self, proxy_manager: Optional[ProxyManager] = None):
+        super().__init__(proxy_manager)
+        # bound in-flight requests per host instead of sleeping between them
+        self._sem = asyncio.Semaphore(Config.SUPABASE_CONCURRENCY)
+        self._gen_sem = asyncio.Semaphore(Config.GENERATOR_CONCURRENCY)
+
+    def _open_session(self) -> aiohttp.ClientSession:
+        """aiohttp session replacing the requests one of MicroSaasClient."""
+        # aiohttp refuses None header values, requests silently drops them
+        headers = {k: v for k, v in self.HEADERS.items() if v is not None}
+        return aiohttp.ClientSession(
+            headers=headers,
+            connector=aiohttp.TCPConnector(
+                limit=64, limit_per_host=16, keepalive_timeout=30
+            ),
+            timeout=aiohttp.ClientTimeout(total=Config.TIMEOUT),
+        )
+
+    async def close(self) -> None:
+        await self.session.close()
+
+    async def __aenter__(self) -> "AsyncMicroSaasClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    # --------------- API calls --------------- #
+    @_retry_on_throttle
+    async def _request_json(
+        self, method: str, url: str, sem: asyncio.Semaphore, **kwargs
+    ) -> Any:
+        """
+        Send a request while holding sem and return the decoded JSON body.
+        429 and 5xx responses are retried with exponential back-off.
+        """
+        proxy = self.proxy_manager.choose_proxy()
+        async with sem:
+            with self.proxy_manager.track(proxy):
+                resp = await self.session.request(
+                    method, url, proxy=proxy and proxy["url"], **kwargs
+                )
+            async with resp:
+                resp.raise_for_status()
+                return await resp.json(loads=orjson.loads, content_type=None)
+
+    @_retry_on_throttle
+    async def _stream_first_item(
+        self, url: str, sem: asyncio.Semaphore, prefix: str
+    ) -> Any:
+        """
+        GET url while holding sem and return the first JSON value at prefix,
+        parsed incrementally so the rest of the body is never materialised.
+        Returns None if nothing matches.
+        """
+        proxy = self.proxy_manager.choose_proxy()
+        async with sem:
+            with self.proxy_manager.track(proxy):
+                resp = await self.session.get(url, proxy=proxy and proxy["url"])
+            async with resp:
+                resp.raise_for_status()
+                async for item in ijson.items(resp.content, prefix, use_float=True):
+                    return item
+        return None
+
+    async def _call_id_generator(self, keyword: str) -> Optional[str]:
+        """
+        Call the micro-saas idea generator API with a keyword.
+        Returns the idea ID if successful, None otherwise.
+        """
+        payload = {"niche": keyword, "userId": Config.USER_ID}
+        try:
+            data = await self._request_json(
+                "POST", self.GENERATOR_URL, self._gen_sem, json=payload
+            )
+            return data.get("id")
+        except aiohttp.ClientResponseError as e:
+            print(f"[ERROR] generator failed: {e}")
+            return None
+        except (
+            aiohttp.ClientError,
+            asyncio.TimeoutError,
+            ValueError,
+            AttributeError,
+        ) as e:
+            # ValueError: non-JSON body, AttributeError: JSON body is not an object
+            print(f"[WARN] generator failed: {e}")
+            return None
+
+    async def _fetch_ideas(self, idea_id: str) -> Dict[str, Any]:
+        cache_key = f"saas:{idea_id}"
+        cached = await response_cache.aget(cache_key)
+        if cached is not None:
+            return cached
+        # only the ideas column is needed, and it is parsed as it streams in
+        url = f"{self.SUPABASE_URL}?select=ideas&id=eq.{idea_id}"
+        row = await self._stream_first_item(url, self._sem, "item")
+        ideas_dict = {"id": idea_id, **row} if row else {}
+        if ideas_dict:
+            await response_cache.aset(cache_key, ideas_dict, Config.SUPABASE_CACHE_TTL)
+        return ideas_dict
+
+    # --------------- public API --------------- #
+    async def deep_extract_ideas(self, keyword: str, limit: int = 12) -> List[Dict[str, Any]]:
+        """
+        Return a list of unique ideas for a keyword.
+        All generator requests are sent at once, then every distinct
+        idea-id is fetched concurrently.
+        """
+        ideas = set()
+        max_nbr_requests = 10
+        with tqdm(desc="Request started", unit="s", leave=False) as bar:
+            start = time.perf_counter()
+            # return_exceptions: one failed call must not discard the whole wave
+            ids = await asyncio.gather(
+                *[self._call_id_generator(keyword) for _ in range(max_nbr_requests)],
+                return_exceptions=True,
+            )
+            bar.set_postfix(elapsed=f"{time.perf_counter()-start:.1f}s")
+            seen_ids = set()
+            unique_ids = []
+            for idea_id in ids:
+                if isinstance(idea_id, BaseException):
+                    print(f"[WARN] generator failed: {idea_id!r}")
+                    continue
+                if idea_id and idea_id not in seen_ids:
+                    seen_ids.add(idea_id)
+                    unique_ids.append(idea_id)
+            dicts = await asyncio.gather(
+                *[self._fetch_ideas(idea_id) for idea_id in unique_ids],
+                return_exceptions=True,
+            )
+            bar.set_postfix(elapsed=f"{time.perf_counter()-start:.1f}s")
+            for ideas_dict in dicts:
+                if isinstance(ideas_dict, BaseException):
+                    print(f"[WARN] fetching ideas failed: {ideas_dict!r}")
+                    continue
+                if not ideas_dict:
+                    continue
+                for idea in self._extract_ideas(ideas_dict):
+                    if len(ideas) >= limit:
+                        break
+                    ideas.add(tuple(idea.items()))
+            print(f"[INFO] Found {len(ideas)} ideas for '{keyword}'")
+
+            final_result = [dict(idea) for idea in ideas]
+            results_file_name = f"ideas_{keyword.lower().replace(' ', '_')}_{limit}"
+            atomic_write_bytes(
+                self.cache_manager.cache_file(results_file_name),
+                msgpack.packb(final_result, use_bin_type=True),
             )
             return final_result